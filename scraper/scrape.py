@@ -1,15 +1,26 @@
 # scrape.py
+import atexit
+import base64
+import codecs
+import copy
+import csv
 import json
-import pandas as pd
 import re
 import os
 import sys
+import threading
+import time
 import requests as http_requests
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field
+from functools import lru_cache
 from time import sleep
-from typing import Optional, List, Dict, Tuple
+from typing import Callable, Optional, List, Dict, Tuple
 from urllib.parse import urlparse, urlunparse
 
+from lxml import etree
+from lxml import html as lxml_html
+
 try:
     import undetected_chromedriver as uc
     UC_AVAILABLE = True
@@ -19,6 +30,7 @@ except ImportError:
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
@@ -34,15 +46,32 @@ PRODUCTS_PATH = os.path.join(DATA_DIR, "products.json")
 LOCATORS_PATH = os.path.join(LOCATORS_DIR, "websitestest.json")
 OUTPUT_JSON_PATH = os.path.join(DATA_DIR, "scraped_data.json")
 OUTPUT_CSV_PATH = os.path.join(DATA_DIR, "scraped_data.csv")
+# One record per finished (product, site), appended as we go; lets a crashed
+# run resume without re-scraping. Removed once scraped_data.json is written.
+OUTPUT_NDJSON_PATH = os.path.join(DATA_DIR, "scraped_data.ndjson")
 DEBUG_DIR = os.path.join(DATA_DIR, "debug")
+CHROME_SESSION_PATH = os.path.join(DATA_DIR, ".chrome_session.json")
 
 DEFAULT_CURRENCY = "INR"
 PAGE_LOAD_TIMEOUT = 40
 WAIT_TIMEOUT = 25
-PER_LOCATOR_TIMEOUT = 4   # short wait per individual locator after the page has settled
+PER_LOCATOR_TIMEOUT = 4   # short wait for any locator to match after the page has settled
+LOCATOR_POLL_INTERVAL = 0.5
 MAX_RETRIES = 4
 VARIANT_WAIT_AFTER_CLICK = 1
+VARIANT_PRICE_TIMEOUT = 3     # min upper bound on waiting for prices to re-render after variant clicks
+VARIANT_PRICE_SETTLE = 0.5    # ...and how long they must then stay unchanged
 JS_SETTLE_AFTER_LOAD = 1.5  # seconds to let JS hydrate the right variant before scraping
+STATIC_FETCH_TIMEOUT = 10   # plain HTTP fetch for sites flagged "static_html"
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+)
+
+# Keep Chrome sessions alive between runs and re-attach to them next time,
+# skipping browser cold-start. Opt-in: CI runners are fresh every run anyway.
+REUSE_CHROME_SESSION = os.environ.get("REUSE_CHROME_SESSION") == "1"
 
 # Price sanity bounds — reject anything outside this range
 MIN_VALID_PRICE = 50.0
@@ -64,6 +93,25 @@ os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(LOCATORS_DIR, exist_ok=True)
 os.makedirs(DEBUG_DIR, exist_ok=True)
 
+# ------------------------------- #
+# Regexes (compiled once at import)
+# ------------------------------- #
+
+_RE_SLUG_STRIP = re.compile(r"[^\w\s-]")
+_RE_SLUG_WS = re.compile(r"[\s]+")
+_RE_NONPRICE = re.compile(r"[^\d,.\s]")
+_RE_WS = re.compile(r"\s+")
+_RE_SEPARATORS = re.compile(r"[.,]")
+_RE_COMMA_DECIMAL = re.compile(r",\d{2}$")
+_RE_JSON_BLOB = re.compile(r"\{.*\}", re.S)
+_RE_PRICE_CTX = re.compile(r"(selling|offer|final|deal)[^₹]{0,80}₹\s*([\d,]+(?:\.\d{1,2})?)", re.I | re.S)
+_RE_PRICE_SIMPLE = re.compile(r"₹\s*([\d,]+(?:\.\d{1,2})?)")
+_RE_HEADER_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+_RE_DOC_CHARSET = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)|<\?xml[^>]+encoding=[\"']([\w.:-]+)", re.I)
+_RE_XML_DECL = re.compile(r"^\s*<\?xml[^>]*\?>")
+_RE_WEIGHT = re.compile(r"\b(?:(?P<kg2>2\s*kg)|(?P<kg1>1\s*kg)|(?P<lb5>5\s*lb))\b", re.I)
+_RE_FLAVOR = re.compile(r"choc|van|cookie|straw|hazel|mango|coffee", re.I)
+
 # ------------------------------- #
 # Helpers
 # ------------------------------- #
@@ -73,18 +121,21 @@ def load_json(file_path: str):
         return json.load(f)
 
 def slugify(s: str) -> str:
-    s = re.sub(r"[^\w\s-]", "", s)
-    s = re.sub(r"[\s]+", "_", s.strip())
+    s = _RE_SLUG_STRIP.sub("", s)
+    s = _RE_SLUG_WS.sub("_", s.strip())
     return s[:100]
 
+# The same raw price strings recur across locators, JSON-LD, meta tags and retries
+@lru_cache(maxsize=4096)
 def normalize_price_text(txt: str) -> str:
     if not txt:
         return ""
     txt = txt.replace(" ", " ").replace(" ", " ").replace(" ", " ")
-    txt = re.sub(r"[^\d,.\s]", "", txt)
-    txt = re.sub(r"\s+", "", txt)
+    txt = _RE_NONPRICE.sub("", txt)
+    txt = _RE_WS.sub("", txt)
     return txt
 
+@lru_cache(maxsize=4096)
 def parse_price(txt: str) -> Optional[float]:
     if not txt:
         return None
@@ -94,12 +145,12 @@ def parse_price(txt: str) -> Optional[float]:
 
     if "," in t and "." in t:
         last_sep = max(t.rfind(","), t.rfind("."))
-        integer = re.sub(r"[.,]", "", t[:last_sep])
+        integer = _RE_SEPARATORS.sub("", t[:last_sep])
         decimal = t[last_sep + 1:]
         t = f"{integer}.{decimal}" if decimal.isdigit() else integer
     else:
         if "," in t:
-            if re.search(r",\d{2}$", t):
+            if _RE_COMMA_DECIMAL.search(t):
                 t = t.replace(".", "").replace(",", ".")
             else:
                 t = t.replace(",", "")
@@ -115,116 +166,172 @@ def parse_price(txt: str) -> Optional[float]:
 
 # ---- JSON-LD / meta / page-source fallbacks ---- #
 
-def find_price_in_obj(obj):
-    if isinstance(obj, dict):
-        if (obj.get("@type") == "Offer" or "offers" in obj) and "price" in obj:
-            p = parse_price(str(obj.get("price", "")))
-            if p is not None:
-                return p, str(obj.get("price"))
-        if "price" in obj:
-            p = parse_price(str(obj.get("price", "")))
-            if p is not None:
-                return p, str(obj.get("price"))
-        for v in obj.values():
-            got = find_price_in_obj(v)
-            if got:
-                return got
-    elif isinstance(obj, list):
-        for it in obj:
-            got = find_price_in_obj(it)
-            if got:
-                return got
+def find_price_in_obj(root):
+    """Depth-first walk over a JSON-LD payload; returns the first parseable
+    (price, raw) pair. Uses an explicit stack instead of recursion, and pushes
+    children reversed so nodes are visited in document order."""
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            price_raw = obj.get("price")
+            if price_raw is not None:
+                p = parse_price(str(price_raw))
+                if p is not None:
+                    return p, str(price_raw)
+            stack.extend(reversed(list(obj.values())))
+        elif isinstance(obj, list):
+            stack.extend(reversed(obj))
     return None
 
-def get_price_from_jsonld(driver) -> Tuple[Optional[float], Optional[str]]:
+def cdp_page_source(driver) -> str:
+    """Serialized DOM via two CDP calls instead of WebDriver's page_source."""
+    try:
+        doc = driver.execute_cdp_cmd("DOM.getDocument", {"depth": 0})
+        return driver.execute_cdp_cmd("DOM.getOuterHTML", {"nodeId": doc["root"]["nodeId"]})["outerHTML"] or ""
+    except Exception:
+        return driver.page_source or ""
+
+# Polled while waiting for prices to render — the check runs in the page and
+# returns a boolean, so the DOM is never shipped over the wire per poll
+HAS_RUPEE_JS = "return document.documentElement.outerHTML.includes('\u20b9');"
+
+def _take_snapshot(driver) -> Tuple[object, str]:
+    """(parsed tree, page source) of the live DOM."""
+    page_source = cdp_page_source(driver)
+    return parse_html(page_source), page_source
+
+def parse_html(page_source: str):
+    """Parses a page-source snapshot once so every fallback below can query the same tree."""
+    if not page_source:
+        return None
     try:
-        scripts = driver.find_elements(By.CSS_SELECTOR, "script[type='application/ld+json']")
-        for s in scripts:
-            raw = s.get_attribute("innerText") or ""
-            if not raw.strip():
+        return lxml_html.fromstring(page_source)
+    except Exception:
+        return None
+
+def get_price_from_jsonld(tree) -> Tuple[Optional[float], Optional[str]]:
+    if tree is None:
+        return None, None
+    for raw in tree.xpath("//script[@type='application/ld+json']/text()"):
+        if not raw.strip():
+            continue
+        try:
+            data = json.loads(raw)
+        except Exception:
+            m = _RE_JSON_BLOB.search(raw)
+            if not m:
                 continue
             try:
-                data = json.loads(raw)
+                data = json.loads(m.group(0))
             except Exception:
-                m = re.search(r"\{.*\}", raw, flags=re.S)
-                if not m:
-                    continue
-                try:
-                    data = json.loads(m.group(0))
-                except Exception:
-                    continue
-            got = find_price_in_obj(data)
-            if got:
-                return got
-    except Exception:
-        pass
+                continue
+        got = find_price_in_obj(data)
+        if got:
+            return got
     return None, None
 
-def get_price_from_meta(driver) -> Tuple[Optional[float], Optional[str]]:
-    sels = [
-        "meta[itemprop='price']",
-        "meta[property='product:price:amount']",
-        "meta[name='twitter:data1']"
-    ]
-    for sel in sels:
-        try:
-            for el in driver.find_elements(By.CSS_SELECTOR, sel):
-                val = el.get_attribute("content") or el.get_attribute("value") or el.get_attribute("data-price") or ""
-                p = parse_price(val)
-                if p is not None:
-                    return p, val
-        except Exception:
-            continue
+META_PRICE_XPATHS = [
+    "//meta[@itemprop='price']",
+    "//meta[@property='product:price:amount']",
+    "//meta[@name='twitter:data1']",
+]
+
+def get_price_from_meta(tree) -> Tuple[Optional[float], Optional[str]]:
+    if tree is None:
+        return None, None
+    for xp in META_PRICE_XPATHS:
+        for el in tree.xpath(xp):
+            val = el.get("content") or el.get("value") or el.get("data-price") or ""
+            p = parse_price(val)
+            if p is not None:
+                return p, val
     return None, None
 
-def get_price_from_pagesource(driver) -> Tuple[Optional[float], Optional[str]]:
-    html = driver.page_source or ""
-    m = re.search(r"(selling|offer|final|deal)[^₹]{0,80}₹\s*([\d,]+(?:\.\d{1,2})?)", html, flags=re.I | re.S)
+def get_price_from_pagesource(html: str) -> Tuple[Optional[float], Optional[str]]:
+    m = _RE_PRICE_CTX.search(html or "")
+    num = m.group(2) if m else None
     if not m:
-        m = re.search(r"₹\s*([\d,]+(?:\.\d{1,2})?)", html)
-    if m:
-        num = m.group(1)
+        m = _RE_PRICE_SIMPLE.search(html or "")
+        num = m.group(1) if m else None
+    if num:
         p = parse_price(num)
         if p and p > MIN_VALID_PRICE:
             return p, f"₹{num}"
     return None, None
 
-def is_page_out_of_stock(driver) -> bool:
-    """Detect out-of-stock signals — restricted to the product container, not the whole body,
-    so we don't trip on related-product carousels or footer 'back-in-stock alerts'."""
-    selectors = [
-        "[class*='product-detail']",
-        "[class*='ProductDetail']",
-        "[class*='product-page']",
-        "[class*='ProductPage']",
-        "[id*='product-info']",
-        "[data-product]",
-        "main",
-    ]
-    for sel in selectors:
-        try:
-            elem = driver.find_element(By.CSS_SELECTOR, sel)
-            text = (elem.text or "").lower()
-            if not text:
-                continue
-            return any(indicator in text for indicator in OUT_OF_STOCK_TEXTS)
-        except Exception:
-            continue
-    # Fall back to body if no product container found, but only check the first 4kb
+def _extract_all_prices(tree, page_source: str) -> Tuple[Optional[float], Optional[str], Optional[str]]:
+    """JSON-LD, then meta tags, then a regex over the raw HTML — all from one
+    page-source snapshot instead of a WebDriver round-trip per element.
+    Returns (price, raw_text, method)."""
+    p, raw = get_price_from_jsonld(tree)
+    if p is not None:
+        return p, raw, "json_ld"
+    p, raw = get_price_from_meta(tree)
+    if p is not None:
+        return p, raw, "meta"
+    p, raw = get_price_from_pagesource(page_source)
+    if p is not None:
+        return p, raw, "page_source"
+    return None, None, None
+
+# JS helper prepended to in-page scripts: the same bar as Selenium's
+# is_displayed — rendered, not visibility:hidden, not opacity:0. innerText of
+# an element that is not rendered falls back to its full textContent
+# (script text included), where Selenium's .text returned "".
+JS_IS_SHOWN = """
+const isShown = el => el.getClientRects().length > 0 &&
+  el.checkVisibility({visibilityProperty: true, opacityProperty: true});
+"""
+
+# Product containers checked for out-of-stock text, most specific first.
+# Restricted to the product container, not the whole body, so we don't trip
+# on related-product carousels or footer 'back-in-stock alerts'.
+PRODUCT_CONTAINER_SELECTORS = [
+    "[class*='product-detail']",
+    "[class*='ProductDetail']",
+    "[class*='product-page']",
+    "[class*='ProductPage']",
+    "[id*='product-info']",
+    "[data-product]",
+    "main",
+]
+
+# Rendered text of the first displayed product container with any text (or, failing
+# that, the first 4kb of the body) plus the first <h1> — one round-trip
+# instead of a find_element + .text per selector.
+PAGE_TEXT_PROBE_JS = JS_IS_SHOWN + """
+const sels = arguments[0];
+let container = null;
+for (const sel of sels) {
+  const el = document.querySelector(sel);
+  const t = el && isShown(el) ? (el.innerText || "") : "";
+  if (t) { container = t; break; }
+}
+const body = container === null && document.body ? (document.body.innerText || "").slice(0, 4000) : "";
+const h1 = document.querySelector("h1");
+return {
+  container: container,
+  body: body,
+  h1: h1 ? (h1.innerText || h1.textContent || "").trim().slice(0, 200) : "",
+};
+"""
+
+def probe_page_text(driver) -> Dict:
     try:
-        body_text = (driver.find_element(By.TAG_NAME, "body").text or "")[:4000].lower()
-        return any(indicator in body_text for indicator in OUT_OF_STOCK_TEXTS)
+        return driver.execute_script(PAGE_TEXT_PROBE_JS, PRODUCT_CONTAINER_SELECTORS) or {}
     except Exception:
-        return False
+        return {}
+
+def is_page_out_of_stock(page_text: Dict) -> bool:
+    """Detect out-of-stock signals in the text captured by probe_page_text()."""
+    text = (page_text.get("container") or page_text.get("body") or "").lower()
+    return any(indicator in text for indicator in OUT_OF_STOCK_TEXTS)
 
-def get_page_h1(driver) -> str:
+def get_page_h1(page_text: Dict) -> str:
     """First h1 on the page — used as an audit-log sanity check
     so we can see what page we actually scraped."""
-    try:
-        h1 = driver.find_element(By.TAG_NAME, "h1")
-        return (h1.text or h1.get_attribute("innerText") or "").strip()[:200]
-    except Exception:
-        return ""
+    return page_text.get("h1") or ""
 
 # ---- Shopify JSON API scraper ---- #
 
@@ -275,41 +382,79 @@ def scrape_shopify(product_url: str) -> Tuple[Optional[float], Optional[str], Op
 
 # ---- Variant selection ---- #
 
-def click_variant_if_found(driver, *needles: str) -> None:
-    needles = [n for n in needles if n]
-    if not needles:
+# Every rupee amount currently rendered — compared before/after a variant
+# click to tell when the page has re-rendered its price.
+PRICE_TEXTS_JS = "return document.body ? document.body.innerText.match(/\u20b9[\\d,.]+/g) : null;"
+
+# Clicks up to 5 displayed elements whose text contains any needle,
+# in-browser, so the page isn't walked element-by-element over WebDriver.
+# Returns [clicked_count, rupee amounts rendered before the clicks].
+CLICK_VARIANTS_JS = JS_IS_SHOWN + """
+const needles = arguments[0];
+const before = document.body ? document.body.innerText.match(/\u20b9[\\d,.]+/g) : null;
+const els = document.querySelectorAll("[role=button],button,a,span,div");
+let clicked = 0;
+for (const el of els) {
+  if (clicked >= 5) break;
+  // Skip detached nodes (an earlier click may have re-rendered them away) and
+  // hidden ones (collapsed dropdowns, duplicate mobile pickers), which
+  // Selenium's .text/.click() never matched either.
+  if (!el.isConnected || !isShown(el)) continue;
+  const t = (el.innerText || "").trim().toLowerCase();
+  if (!t || !needles.some(n => t.includes(n))) continue;
+  try {
+    el.scrollIntoView({block: "center"});
+    el.click();
+    clicked++;
+  } catch (err) {}
+}
+return [clicked, before];
+"""
+
+def click_variant_if_found(driver, lower_needles: Tuple[str, ...]) -> None:
+    """`lower_needles` must already be lower-cased (see scrape_all)."""
+    lower_needles = [n for n in lower_needles if n]
+    if not lower_needles:
         return
-    lower_needles = [n.lower() for n in needles]
-    xpath = "//*[@role='button' or self::button or self::a or self::span or self::div]"
     try:
-        elems = WebDriverWait(driver, 5).until(EC.presence_of_all_elements_located((By.XPATH, xpath)))
+        clicked, before = driver.execute_script(CLICK_VARIANTS_JS, lower_needles)
     except Exception:
-        elems = []
-    tried = 0
-    for el in elems:
-        if tried >= 5:
-            break
+        return
+    if not clicked:
+        return
+    # Wait for the rendered prices to change and then hold still for
+    # VARIANT_PRICE_SETTLE, so a hydration/carousel tick or the first of two
+    # clicks doesn't end the wait early. Bounded by at least the old fixed
+    # budget of VARIANT_WAIT_AFTER_CLICK per click (e.g. when the clicked
+    # variant was already selected and nothing changes).
+    deadline = time.monotonic() + max(VARIANT_PRICE_TIMEOUT, VARIANT_WAIT_AFTER_CLICK * clicked)
+    last, changed_at = before, None
+    while time.monotonic() < deadline:
+        sleep(0.1)
         try:
-            txt = (el.text or el.get_attribute("innerText") or "").strip().lower()
-            if any(n in txt for n in lower_needles):
-                driver.execute_script("arguments[0].scrollIntoView({block:'center'});", el)
-                el.click()
-                tried += 1
-                sleep(VARIANT_WAIT_AFTER_CLICK)
+            current = driver.execute_script(PRICE_TEXTS_JS)
         except Exception:
-            continue
+            return
+        if current != last:
+            last, changed_at = current, time.monotonic()
+        elif changed_at is not None and time.monotonic() - changed_at >= VARIANT_PRICE_SETTLE:
+            return
+
+# Variant button texts to look for, per weight group matched in the product name
+WEIGHT_NEEDLES = {
+    "kg2": ("2 kg", "2kg", "4.4 lb", "4.4lb"),
+    "kg1": ("1 kg", "1kg", "2.2 lb", "2.2lb"),
+    "lb5": ("5 lb", "5lb", "2.27 kg", "2.27kg"),
+}
 
 def extract_variant_needles(product_name: str) -> List[str]:
     needles: List[str] = []
-    if re.search(r"\b2\s*kg\b", product_name, re.I):
-        needles += ["2 kg", "2kg", "4.4 lb", "4.4lb"]
-    if re.search(r"\b1\s*kg\b", product_name, re.I):
-        needles += ["1 kg", "1kg", "2.2 lb", "2.2lb"]
-    if re.search(r"\b5\s*lb\b", product_name, re.I):
-        needles += ["5 lb", "5lb", "2.27 kg", "2.27kg"]
-    parts = [p.strip() for p in product_name.split("|")]
-    for token in reversed(parts):
-        if any(k in token.lower() for k in ["choc", "van", "cookie", "straw", "hazel", "mango", "coffee"]):
+    found = {m.lastgroup for m in _RE_WEIGHT.finditer(product_name)}
+    for group, expansions in WEIGHT_NEEDLES.items():
+        if group in found:
+            needles += expansions
+    for token in reversed(product_name.split("|")):
+        if _RE_FLAVOR.search(token):
             needles.append(token.strip())
             break
     return needles
@@ -320,25 +465,91 @@ def extract_variant_needles(product_name: str) -> List[str]:
 
 LOCATOR_MAP = {"xpath": By.XPATH, "css": By.CSS_SELECTOR}
 
-@dataclass
+# Header of the per-site probe generated by build_probe_js(). `hit` records
+# [index, text] for every matched element, even with empty text, so the
+# caller can tell "present but not a price" from "not rendered yet".
+# Like EC.visibility_of_element_located, a visible-only probe never matches
+# <meta> (never rendered); those prices are left to the meta fallback.
+_PROBE_JS_HEADER = JS_IS_SHOWN + """
+const out = [];
+const hit = (i, el, isMeta, mustBeVisible) => {
+  if (!el) return;
+  if (mustBeVisible && !isShown(el)) return;
+  const txt = ((isMeta && el.getAttribute("content")) || el.innerText || el.textContent || "").trim();
+  out.push([i, txt]);
+};
+"""
+
+def build_probe_js(resolved: Tuple[Tuple[int, str, str, bool], ...], wait_visible: bool) -> str:
+    """
+    Generates a probe script specialised to one site's locator config: each
+    selector is inlined as a literal, in fallback order, so nothing is looked
+    up or marshalled per call. Evaluates every locator in one round-trip and
+    returns [[index, text], ...] for those that currently match.
+    """
+    lines = [_PROBE_JS_HEADER]
+    for i, by, val, is_meta in resolved:
+        if by == By.XPATH:
+            lookup = f"document.evaluate({json.dumps(val)}, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue"
+        else:
+            lookup = f"document.querySelector({json.dumps(val)})"
+        lines.append(f"try {{ hit({i}, {lookup}, {json.dumps(is_meta)}, {json.dumps(wait_visible)}); }} catch (e) {{}}")
+    lines.append("return out;")
+    return "\n".join(lines)
+
+@dataclass(frozen=True)
 class SiteLocator:
     website_name: str
     locators: List[Dict]
     wait_visible: bool = True
+    # Site config "static_html": true — the price is server-rendered, so try a
+    # plain HTTP fetch before paying for a browser page load.
+    static_html: bool = False
+    # (index, by, value, is_meta) per valid locator, resolved once from `locators`.
+    # `index` is the position in the original config, kept for the css_<i> audit label.
+    resolved: Tuple[Tuple[int, str, str, bool], ...] = field(init=False, repr=False)
+    # In-browser probe generated from `resolved`, see build_probe_js()
+    probe_js: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        resolved = []
+        for i, loc in enumerate(self.locators):
+            by = LOCATOR_MAP.get((loc.get("locator_type") or "").lower())
+            val = loc.get("locator_value") or ""
+            if by and val:
+                # For meta tags we need the content attribute, not the text
+                resolved.append((i, by, val, val.startswith("meta") or "meta[" in val))
+        object.__setattr__(self, "resolved", tuple(resolved))
+        object.__setattr__(self, "probe_js", build_probe_js(self.resolved, self.wait_visible))
 
 class WebsiteScraper:
     def __init__(self, site: SiteLocator):
         self.site = site
 
-    def _get_element_text(self, elem) -> str:
-        txt = elem.text or ""
-        if not txt:
-            txt = elem.get_attribute("textContent") or elem.get_attribute("innerText") or ""
-        return txt.strip()
-
-    def get_price(self, driver) -> Tuple[Optional[float], Optional[str], Optional[str]]:
+    def _probe_locators(self, driver):
+        """
+        One polling step. Returns (best, settled): `best` is the first hit in
+        config order whose text parses as a price; `settled` is True once every
+        locator ahead of it has rendered an element that isn't a price — i.e.
+        the sequential chain would have moved past them too.
+        """
+        seen = set()
+        for i, raw in driver.execute_script(self.site.probe_js) or []:
+            price = parse_price(raw)
+            if price is not None:
+                settled = all(j in seen for j, *_ in self.site.resolved if j < i)
+                return (price, raw, f"css_{i}"), settled
+            seen.add(i)
+        return None, False
+
+    def get_price(self, driver, snapshot: Callable[[], Tuple[object, str]]) -> Tuple[Optional[float], Optional[str], Optional[str]]:
         """
         Tries CSS/XPath locators FIRST, then JSON-LD/meta as fallback.
+        All locators are probed together by the site's generated probe,
+        one execute_script per poll.
+        The fallbacks read from `snapshot()` — (tree, page_source) — which is
+        only called once the locator chain has missed, so they see the DOM as
+        of after the locator wait.
         Returns (price, raw_text, method) — `method` identifies which strategy
         produced the price (e.g. "css_0", "json_ld") for the audit log.
 
@@ -347,45 +558,175 @@ class WebsiteScraper:
         select. CSS selectors target the visibly rendered price, which the
         client-side JS has already updated to the chosen variant.
         """
-        for i, loc in enumerate(self.site.locators):
-            by = LOCATOR_MAP.get((loc.get("locator_type") or "").lower())
-            val = loc.get("locator_value") or ""
-            if not (by and val):
-                continue
-            try:
-                wait = WebDriverWait(driver, PER_LOCATOR_TIMEOUT)
-                elem = wait.until(
-                    EC.visibility_of_element_located((by, val))
-                    if self.site.wait_visible
-                    else EC.presence_of_element_located((by, val))
-                )
-                # For meta tags we need the content attribute, not the text
-                if val.startswith("meta") or "meta[" in val:
-                    raw = elem.get_attribute("content") or self._get_element_text(elem)
-                else:
-                    raw = self._get_element_text(elem)
-                price = parse_price(raw)
-                if price is not None:
-                    return price, raw, f"css_{i}"
-            except Exception:
-                continue
+        if self.site.resolved:
+            # A lower-priority hit only wins early if every locator ahead of it
+            # has already shown a non-price; otherwise keep polling so a primary
+            # (variant-specific) locator that renders late still takes precedence,
+            # and fall back to the best hit seen once the deadline passes.
+            deadline = time.monotonic() + PER_LOCATOR_TIMEOUT
+            best = None
+            while True:
+                try:
+                    hit, settled = self._probe_locators(driver)
+                except Exception:
+                    hit, settled = None, False
+                if hit is not None:
+                    best = hit
+                    if settled:
+                        return best
+                if time.monotonic() >= deadline:
+                    break
+                sleep(LOCATOR_POLL_INTERVAL)
+            if best is not None:
+                return best
 
         # Fallbacks — JSON-LD/meta/regex. Used only when CSS chain is exhausted.
-        p, raw = get_price_from_jsonld(driver)
-        if p is not None:
-            return p, raw, "json_ld"
-        p, raw = get_price_from_meta(driver)
-        if p is not None:
-            return p, raw, "meta"
-        p, raw = get_price_from_pagesource(driver)
-        if p is not None:
-            return p, raw, "page_source"
-        return None, None, None
+        tree, page_source = snapshot()
+        return _extract_all_prices(tree, page_source)
+
+# ---- Static HTML fast path ---- #
+
+def _get_http_session() -> http_requests.Session:
+    """Per-thread keep-alive session for static fetches."""
+    session = getattr(_thread_local, "http", None)
+    if session is None:
+        session = http_requests.Session()
+        session.headers["User-Agent"] = USER_AGENT
+        _thread_local.http = session
+    return session
+
+def _node_text(node) -> str:
+    # xpath() can return plain strings for text()/@attr locators
+    if isinstance(node, str):
+        return node.strip()
+    return (node.text_content() or "").strip()
+
+def _decode_html(resp) -> str:
+    """
+    Decodes a static fetch using the Content-Type charset, else the document's
+    own <meta charset>/XML declaration, else UTF-8. resp.text won't do:
+    requests assumes ISO-8859-1 for text/html without a header charset, which
+    turns "₹" into mojibake. The XML declaration is dropped because lxml
+    refuses str input that carries one.
+    """
+    encoding = None
+    m = _RE_HEADER_CHARSET.search(resp.headers.get("Content-Type", ""))
+    if m:
+        encoding = m.group(1)
+    else:
+        m = _RE_DOC_CHARSET.search(resp.content[:4096])
+        if m:
+            encoding = (m.group(1) or m.group(2)).decode("ascii")
+    try:
+        codecs.lookup(encoding or "")
+    except LookupError:
+        encoding = "utf-8"
+    return _RE_XML_DECL.sub("", resp.content.decode(encoding, errors="replace"), count=1)
+
+def scrape_static(product_url: str, site: SiteLocator) -> Optional[Dict]:
+    """
+    Fetches the page over plain HTTP and runs the site's locators, then the
+    JSON-LD/meta/regex fallbacks, against the server-rendered HTML.
+    Returns the partial result dict on a hit, None to fall through to Selenium.
+    Only used for sites flagged "static_html" — elsewhere JSON-LD/HTML carry
+    the default variant's price, not the one the URL selects.
+    """
+    try:
+        resp = _get_http_session().get(product_url, timeout=STATIC_FETCH_TIMEOUT)
+    except Exception:
+        return None
+    if resp.status_code != 200:
+        return None
+    page_source = _decode_html(resp)
+    tree = parse_html(page_source)
+    if tree is None:
+        return None
+
+    price, raw, method = None, None, None
+    for i, by, val, is_meta in site.resolved:
+        try:
+            nodes = tree.xpath(val) if by == By.XPATH else tree.cssselect(val)
+        except Exception:
+            continue
+        if not nodes:
+            continue
+        node = nodes[0]
+        raw = (node.get("content") if is_meta and not isinstance(node, str) else None) or _node_text(node)
+        price = parse_price(raw)
+        if price is not None:
+            method = f"static_css_{i}"
+            break
+    if price is None:
+        price, raw, fallback = _extract_all_prices(tree, page_source)
+        if price is None:
+            return None
+        method = f"static_{fallback}"
+
+    json_ld_price, _ = get_price_from_jsonld(tree)
+
+    # text_content() includes inline script/style text, which innerText (used
+    # on the Selenium path) does not — strip them so e.g. a "Sold out" string
+    # in a JS bundle doesn't flag the page out of stock.
+    visible = copy.deepcopy(tree)
+    etree.strip_elements(visible, "script", "style", "noscript", with_tail=False)
+
+    container_text = ""
+    for sel in PRODUCT_CONTAINER_SELECTORS:
+        nodes = visible.cssselect(sel)
+        container_text = _node_text(nodes[0]) if nodes else ""
+        if container_text:
+            break
+    body = visible.find("body")
+    h1s = visible.xpath("//h1")
+    page_text = {
+        "container": container_text or None,
+        "body": _node_text(body)[:4000] if body is not None else "",
+        "h1": _node_text(h1s[0])[:200] if h1s else "",
+    }
+
+    return {
+        "price_value": price,
+        "raw": raw,
+        "method": method,
+        "final_url": resp.url or product_url,
+        "page_h1": get_page_h1(page_text),
+        "json_ld_price": json_ld_price,
+        "in_stock": not is_page_out_of_stock(page_text),
+    }
 
 # ------------------------------- #
 # Driver
 # ------------------------------- #
 
+# Chrome content settings: block images (the only heavy subresource this
+# can switch off) and deny popups/permission prompts that can steal focus.
+# Stylesheets/fonts have no content setting, and blocking CSS via
+# BLOCKED_URL_PATTERNS would make hidden other-variant prices look visible
+# to the locator probe, so they are left alone.
+CHROME_CONTENT_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.popups": 2,
+    "profile.managed_default_content_settings.geolocation": 2,
+    "profile.managed_default_content_settings.notifications": 2,
+}
+
+# Analytics/ad hosts blocked at the network layer via CDP
+BLOCKED_URL_PATTERNS = [
+    "*googletagmanager*",
+    "*google-analytics*",
+    "*doubleclick*",
+    "*facebook.net*",
+    "*hotjar*",
+]
+
+def _block_trackers(driver) -> None:
+    """Blocked URLs persist for the whole session, so this runs once per driver."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        print(f"[WARN] Could not set blocked URLs ({e})")
+
 def _get_selenium_options() -> Options:
     options = Options()
     options.add_argument("--headless=new")
@@ -397,14 +738,11 @@ def _get_selenium_options() -> Options:
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
-    options.add_argument(
-        "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36"
-    )
+    options.add_argument(f"--user-agent={USER_AGENT}")
     # Use 'normal' so JS-rendered variant prices have a chance to hydrate
     # before we start scraping. 'eager' was returning unselected-variant prices.
     options.page_load_strategy = "normal"
-    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    options.add_experimental_option("prefs", CHROME_CONTENT_PREFS)
     return options
 
 def build_driver() -> webdriver.Chrome:
@@ -418,7 +756,7 @@ def build_driver() -> webdriver.Chrome:
                         "--disable-gpu", "--log-level=3", "--window-size=1366,768"]:
                 uc_options.add_argument(arg)
             uc_options.page_load_strategy = "normal"
-            uc_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+            uc_options.add_experimental_option("prefs", CHROME_CONTENT_PREFS)
 
             kwargs = {"options": uc_options, "use_subprocess": True}
             if chrome_bin:
@@ -426,6 +764,7 @@ def build_driver() -> webdriver.Chrome:
 
             driver = uc.Chrome(**kwargs)
             driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+            _block_trackers(driver)
             print("[INFO] Using undetected_chromedriver")
             return driver
         except Exception as e:
@@ -437,8 +776,28 @@ def build_driver() -> webdriver.Chrome:
 
     driver = webdriver.Chrome(options=options)
     driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    _block_trackers(driver)
     return driver
 
+class PersistentWebdriver(webdriver.Remote):
+    """Re-attaches to a Chrome session left running by a previous run
+    instead of starting a new one."""
+
+    def __init__(self, command_executor: str, session_id: str):
+        self._attach_session_id = session_id
+        executor = ChromiumRemoteConnection(command_executor, "goog", "chrome")
+        # _commands is Selenium's module-global table — extend a private copy
+        executor._commands = {**executor._commands, "getSession": ("GET", "/session/$sessionId")}
+        super().__init__(command_executor=executor, options=Options())
+
+    def start_session(self, capabilities: dict) -> None:
+        # Raises if the session is gone, which sends the caller back to build_driver()
+        self.session_id = self._attach_session_id
+        self.caps = self.execute("getSession")["value"]
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
 def ensure_locators_schema(site_cfg: dict) -> List[Dict]:
     if isinstance(site_cfg.get("locators"), list):
         return site_cfg["locators"]
@@ -446,202 +805,463 @@ def ensure_locators_schema(site_cfg: dict) -> List[Dict]:
         return [{"locator_type": site_cfg["locator_type"], "locator_value": site_cfg["locator_value"]}]
     return []
 
+# ------------------------------- #
+# Driver Pool
+# ------------------------------- #
+
+# Page loads are network-bound, so a few Chrome instances in parallel
+# scale close to linearly. Each worker thread owns exactly one driver,
+# so SCRAPER_MAX_WORKERS trades memory (one Chrome each) for overlap.
+MAX_WORKERS = max(1, int(os.environ.get("SCRAPER_MAX_WORKERS") or min(8, (os.cpu_count() or 1) * 2)))
+
+_thread_local = threading.local()
+_drivers: List[webdriver.Remote] = []
+_drivers_lock = threading.Lock()
+_saved_sessions: Optional[List[Dict]] = None  # sessions from CHROME_SESSION_PATH not yet attached
+
+def _pop_saved_session() -> Optional[Dict]:
+    global _saved_sessions
+    with _drivers_lock:
+        if _saved_sessions is None:
+            try:
+                _saved_sessions = load_json(CHROME_SESSION_PATH).get("sessions", [])
+            except Exception:
+                _saved_sessions = []
+        return _saved_sessions.pop() if _saved_sessions else None
+
+def try_attach_existing() -> Optional[webdriver.Remote]:
+    saved = _pop_saved_session()
+    if not saved:
+        return None
+    try:
+        driver = PersistentWebdriver(saved["url"], saved["session_id"])
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        print(f"[INFO] Attached to existing Chrome session {saved['session_id'][:8]}")
+        return driver
+    except Exception as e:
+        print(f"[WARN] Could not attach to saved Chrome session ({e}), starting a new one")
+        return None
+
+def get_driver() -> webdriver.Remote:
+    """Driver owned by the calling thread — built lazily on first use."""
+    driver = getattr(_thread_local, "driver", None)
+    if driver is None:
+        driver = (try_attach_existing() if REUSE_CHROME_SESSION else None) or build_driver()
+        _thread_local.driver = driver
+        with _drivers_lock:
+            _drivers.append(driver)
+    return driver
+
+def _close_extra_tabs(driver) -> None:
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+
+def _park_for_reuse(drivers: List[webdriver.Remote]) -> List[webdriver.Remote]:
+    """Leaves sessions running for the next run and records them in
+    CHROME_SESSION_PATH. Returns the drivers that still need quitting."""
+    global _saved_sessions
+    sessions = list(_saved_sessions or [])
+    leftover = []
+    for driver in drivers:
+        # undetected_chromedriver kills its browser when the object is collected
+        if UC_AVAILABLE and isinstance(driver, uc.Chrome):
+            leftover.append(driver)
+            continue
+        try:
+            _close_extra_tabs(driver)
+            service = getattr(driver, "service", None)
+            if service is not None:
+                service.process = None  # detach so chromedriver outlives this process
+            sessions.append({"url": driver.command_executor._url, "session_id": driver.session_id})
+        except Exception:
+            leftover.append(driver)
+    try:
+        with open(CHROME_SESSION_PATH, "w", encoding="utf-8") as f:
+            json.dump({"sessions": sessions}, f, indent=2)
+    except Exception as e:
+        print(f"[WARN] Could not save Chrome sessions ({e})")
+    _saved_sessions = sessions
+    return leftover
+
+def quit_all_drivers() -> None:
+    with _drivers_lock:
+        drivers = list(_drivers)
+        _drivers.clear()
+    if REUSE_CHROME_SESSION and drivers:
+        drivers = _park_for_reuse(drivers)
+    for driver in drivers:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+atexit.register(quit_all_drivers)
+
+# ------------------------------- #
+# Debug Artifacts
+# ------------------------------- #
+
+# Screenshot/HTML dumps for failed scrapes are captured over CDP (still raw
+# base64/HTML) and decoded + written here, off the scraping threads.
+_debug_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="debug")
+_debug_futures: List = []
+_debug_lock = threading.Lock()
+
+def _write_debug(fn_base: str, png_b64: str, html: str) -> None:
+    try:
+        with open(os.path.join(DEBUG_DIR, f"{fn_base}.png"), "wb") as fp:
+            fp.write(base64.b64decode(png_b64))
+        with open(os.path.join(DEBUG_DIR, f"{fn_base}.html"), "w", encoding="utf-8") as fp:
+            fp.write(html)
+    except Exception as e:
+        print(f"    [WARN] Could not write debug artifacts for {fn_base}: {e}")
+
+def dump_debug_artifacts(driver, fn_base: str) -> None:
+    try:
+        png_b64 = driver.execute_cdp_cmd("Page.captureScreenshot", {"format": "png"})["data"]
+    except Exception:
+        png_b64 = driver.get_screenshot_as_base64()
+    html = cdp_page_source(driver)
+    with _debug_lock:
+        _debug_futures.append(_debug_pool.submit(_write_debug, fn_base, png_b64, html))
+
+def flush_debug_artifacts() -> None:
+    with _debug_lock:
+        pending = list(_debug_futures)
+        _debug_futures.clear()
+    wait(pending)
+
 # ------------------------------- #
 # Main Scraping Function
 # ------------------------------- #
 
+PRICE_NOT_AVAILABLE = "Price Not Available"
+
+# Result for a product that has no URL on a site — the most common case in
+# large runs, so it is built once and copied.
+NO_URL_RESULT = {
+    "status": "no_url",
+    "currency": DEFAULT_CURRENCY,
+    "price_value": None,
+    "original_price": None,
+    "price_display": "Information Unavailable",
+    "raw": "",
+    "link": "",
+    "final_url": "",
+    "method": None,
+    "page_h1": "",
+    "json_ld_price": None,
+}
+
+def scrape_one(product_key: str, website_name: str, product_url: str,
+               scraper: WebsiteScraper, lower_needles: Tuple[str, ...]) -> Dict:
+    """Scrapes a single (product, website) pair and returns its result dict.
+    `lower_needles` are the product's lower-cased variant needles."""
+    print(f"    [INFO] {product_key} -> {website_name}")
+
+    if not product_url:
+        return NO_URL_RESULT.copy()
+
+    # ---- Shopify API path (no Selenium needed) ----
+    shopify_domain = SHOPIFY_SITES.get(website_name)
+    if shopify_domain and shopify_domain in product_url:
+        price_value, raw_text, original_price_value, in_stock = scrape_shopify(product_url)
+        if price_value is not None:
+            status = "ok" if in_stock else "out_of_stock"
+            price_display = f"₹{price_value:.2f}"
+        else:
+            status = "price_not_found"
+            price_display = PRICE_NOT_AVAILABLE
+            original_price_value = None
+
+        print(f"    [SHOPIFY] {product_key} / {website_name}: {price_display} (in_stock={in_stock})")
+        return {
+            "status": status,
+            "currency": DEFAULT_CURRENCY,
+            "price_value": price_value,
+            "original_price": original_price_value,
+            "price_display": price_display,
+            "raw": raw_text,
+            "link": product_url,
+            "final_url": product_url,
+            "method": "shopify_api",
+            "page_h1": "",
+            "json_ld_price": None,
+        }
+
+    # ---- Static HTML path (no browser, only for "static_html" sites) ----
+    if scraper.site.static_html:
+        got = scrape_static(product_url, scraper.site)
+        if got is not None:
+            price_value = got["price_value"]
+            status = "ok" if got["in_stock"] else "out_of_stock"
+            price_display = f"₹{price_value:.2f}"
+            print(f"    [STATIC] {product_key} / {website_name}: {price_display} via {got['method']}")
+            return {
+                "status": status,
+                "currency": DEFAULT_CURRENCY,
+                "price_value": price_value,
+                "original_price": None,
+                "price_display": price_display,
+                "raw": got["raw"],
+                "link": product_url,
+                "final_url": got["final_url"],
+                "method": got["method"],
+                "page_h1": got["page_h1"],
+                "json_ld_price": got["json_ld_price"],
+            }
+
+    # ---- Selenium path ----
+    driver = get_driver()
+
+    status = "ok"
+    price_value: Optional[float] = None
+    raw_text: Optional[str] = None
+    in_stock = True
+    method: Optional[str] = None
+    final_url = ""
+    page_h1 = ""
+    json_ld_price: Optional[float] = None
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            driver.get(product_url)
+
+            # Wait for body, then for any ₹ to appear, then settle.
+            # This applies to ALL sites now (previously only Flipkart/MuscleBlaze)
+            # so dynamic variant prices have time to hydrate.
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.TAG_NAME, "body"))
+            )
+
+            if website_name in ("Flipkart", "MuscleBlaze"):
+                click_variant_if_found(driver, lower_needles)
+
+            try:
+                WebDriverWait(driver, 8).until(
+                    lambda d: d.execute_script(HAS_RUPEE_JS)
+                )
+            except Exception:
+                pass
+
+            # Let JS finish hydrating the selected variant before scraping
+            sleep(JS_SETTLE_AFTER_LOAD)
+
+            # At most one page-source snapshot + parse per attempt, taken lazily
+            # and shared by the fallbacks and the JSON-LD audit below
+            snapshot = lru_cache(maxsize=1)(lambda: _take_snapshot(driver))
+
+            # CSS/XPath locators FIRST, then JSON-LD/meta as fallback
+            p, raw, m = scraper.get_price(driver, snapshot)
+
+            # Audit: capture what JSON-LD said even if we used a CSS hit,
+            # so we can spot variant mismatches in scraped_data.json
+            try:
+                jp, _ = get_price_from_jsonld(snapshot()[0])
+                json_ld_price = jp
+            except Exception:
+                json_ld_price = None
+
+            # Capture audit metadata (final URL after redirects, page h1)
+            try:
+                final_url = driver.current_url or product_url
+            except Exception:
+                final_url = product_url
+            page_text = probe_page_text(driver)
+            page_h1 = get_page_h1(page_text)
+
+            price_value, raw_text, method = p, raw, m
+
+            # Check for out-of-stock signals
+            if price_value is not None:
+                in_stock = not is_page_out_of_stock(page_text)
+
+            status = "ok" if price_value is not None else "price_not_found"
+            if price_value is not None and not in_stock:
+                status = "out_of_stock"
+            break
+
+        except Exception as e:
+            status = f"error:{type(e).__name__}"
+            sleep(1.0 * attempt)
+    else:
+        try:
+            dump_debug_artifacts(driver, f"{slugify(product_key)}__{slugify(website_name)}")
+        except Exception:
+            pass
+
+    price_display = f"₹{price_value:.2f}" if price_value is not None else PRICE_NOT_AVAILABLE
+
+    return {
+        "status": status,
+        "currency": DEFAULT_CURRENCY,
+        "price_value": price_value,
+        "original_price": None,
+        "price_display": price_display,
+        "raw": raw_text,
+        "link": product_url,
+        "final_url": final_url,
+        "method": method,
+        "page_h1": page_h1,
+        "json_ld_price": json_ld_price,
+    }
+
+CSV_FIELDS = [
+    "ProductKey", "ProductName", "Website", "Status", "Currency", "Price",
+    "OriginalPrice", "Method", "JsonLdPrice", "FinalURL", "PageH1", "Link", "Raw",
+]
+
+def _csv_row(product_key: str, product_name: str, site: str, info: Dict) -> Dict:
+    return {
+        "ProductKey": product_key,
+        "ProductName": product_name,
+        "Website": site,
+        "Status": info.get("status"),
+        "Currency": info.get("currency"),
+        "Price": info.get("price_value"),
+        "OriginalPrice": info.get("original_price"),
+        "Method": info.get("method"),
+        "JsonLdPrice": info.get("json_ld_price"),
+        "FinalURL": info.get("final_url"),
+        "PageH1": info.get("page_h1"),
+        "Link": info.get("link"),
+        "Raw": info.get("raw"),
+    }
+
+def _is_error(info: Dict) -> bool:
+    return (info.get("status") or "").startswith("error:")
+
+def load_checkpoint(path: str) -> Dict[Tuple[str, str], Dict]:
+    """(product_key, site) -> result dict from a previous, interrupted run.
+    error:* results are never treated as done, so a resumed run retries them."""
+    done: Dict[Tuple[str, str], Dict] = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                key = (record.pop("p"), record.pop("s"))
+            except Exception:
+                continue  # torn last line from a crash
+            if not _is_error(record):
+                done[key] = record
+    return done
+
+def _open_checkpoint_for_append(path: str):
+    """Opens the checkpoint in append mode, first terminating a torn last line
+    so the next record doesn't get glued onto it."""
+    torn = False
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b"\n"
+    fp = open(path, "a", encoding="utf-8")
+    if torn:
+        fp.write("\n")
+    return fp
+
 def scrape_all():
     products = load_json(PRODUCTS_PATH)
     locator_cfg = load_json(LOCATORS_PATH)
 
-    results: Dict[str, Dict] = {}
-    driver = build_driver()
-
+    # Locators are resolved once per site, not once per (product, site)
+    scrapers = {
+        website_name: WebsiteScraper(SiteLocator(
+            website_name,
+            ensure_locators_schema(site_cfg),
+            static_html=bool(site_cfg.get("static_html")),
+        ))
+        for website_name, site_cfg in locator_cfg.items()
+    }
+
+    # Flatten products × websites into independent tasks
+    product_names: Dict[str, str] = {}
+    tasks = []
+    for product_key, product_cfg in products.items():
+        product_name = (product_cfg.get("product_name") or "").strip()
+        product_names[product_key] = product_name
+        lower_needles = tuple(map(str.lower, extract_variant_needles(product_name)))
+        websites = product_cfg.get("websites") or {}
+        for website_name in locator_cfg:
+            product_url = (websites.get(website_name) or "").strip()
+            tasks.append((product_key, website_name, product_url, scrapers[website_name], lower_needles))
+
+    # Resume: anything already in the checkpoint is not scraped again
+    checkpoint = load_checkpoint(OUTPUT_NDJSON_PATH)
+    site_results: Dict[Tuple[str, str], Dict] = {
+        (t[0], t[1]): checkpoint[(t[0], t[1])] for t in tasks if (t[0], t[1]) in checkpoint
+    }
+    pending = [t for t in tasks if (t[0], t[1]) not in site_results]
+    if site_results:
+        print(f"[INFO] Resuming: {len(site_results)} results loaded from {OUTPUT_NDJSON_PATH}")
+
+    print(f"[INFO] Scraping {len(products)} products x {len(locator_cfg)} sites "
+          f"({len(pending)} pending) with {MAX_WORKERS} workers")
+
+    # CSV rows are written as results arrive (completion order), so partial
+    # output survives a crash mid-run.
+    csv_fp = open(OUTPUT_CSV_PATH, "w", newline="", encoding="utf-8")
+    ndjson_fp = _open_checkpoint_for_append(OUTPUT_NDJSON_PATH)
     try:
-        for product_key, product_cfg in products.items():
-            product_name = (product_cfg.get("product_name") or "").strip()
-            websites = product_cfg.get("websites") or {}
-
-            print(f"\n[INFO] Scraping product: {product_name} ({product_key})")
-            product_data: Dict[str, Dict] = {}
-
-            for website_name, site_cfg in locator_cfg.items():
-                print(f"    [INFO] -> {website_name}")
-                product_url = (websites.get(website_name) or "").strip()
-
-                if not product_url:
-                    product_data[website_name] = {
-                        "status": "no_url",
-                        "currency": DEFAULT_CURRENCY,
-                        "price_value": None,
-                        "original_price": None,
-                        "price_display": "Information Unavailable",
-                        "raw": "",
-                        "link": "",
-                        "final_url": "",
-                        "method": None,
-                        "page_h1": "",
-                        "json_ld_price": None,
-                    }
-                    continue
-
-                # ---- Shopify API path (no Selenium needed) ----
-                shopify_domain = SHOPIFY_SITES.get(website_name)
-                if shopify_domain and shopify_domain in product_url:
-                    price_value, raw_text, original_price_value, in_stock = scrape_shopify(product_url)
-                    if price_value is not None:
-                        status = "ok" if in_stock else "out_of_stock"
-                        price_display = f"₹{price_value:.2f}"
-                    else:
-                        status = "price_not_found"
-                        price_display = "Price Not Available"
-                        original_price_value = None
-
-                    product_data[website_name] = {
-                        "status": status,
-                        "currency": DEFAULT_CURRENCY,
-                        "price_value": price_value,
-                        "original_price": original_price_value,
-                        "price_display": price_display,
-                        "raw": raw_text,
-                        "link": product_url,
-                        "final_url": product_url,
-                        "method": "shopify_api",
-                        "page_h1": "",
-                        "json_ld_price": None,
-                    }
-                    print(f"    [SHOPIFY] {website_name}: {price_display} (in_stock={in_stock})")
-                    continue
-
-                # ---- Selenium path ----
-                locs = ensure_locators_schema(site_cfg)
-                scraper = WebsiteScraper(SiteLocator(website_name, locs))
-
-                status = "ok"
-                price_value: Optional[float] = None
-                raw_text: Optional[str] = None
-                in_stock = True
-                method: Optional[str] = None
-                final_url = ""
-                page_h1 = ""
-                json_ld_price: Optional[float] = None
-
-                for attempt in range(1, MAX_RETRIES + 1):
+        writer = csv.DictWriter(csv_fp, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for (product_key, website_name), info in site_results.items():
+            writer.writerow(_csv_row(product_key, product_names[product_key], website_name, info))
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            futures = {pool.submit(scrape_one, *task): task for task in pending}
+            try:
+                for future in as_completed(futures):
+                    product_key, website_name, product_url, _, _ = futures[future]
                     try:
-                        driver.get(product_url)
-
-                        # Wait for body, then for any ₹ to appear, then settle.
-                        # This applies to ALL sites now (previously only Flipkart/MuscleBlaze)
-                        # so dynamic variant prices have time to hydrate.
-                        WebDriverWait(driver, 15).until(
-                            EC.presence_of_element_located((By.TAG_NAME, "body"))
-                        )
-
-                        if website_name in ("Flipkart", "MuscleBlaze"):
-                            needles = extract_variant_needles(product_name)
-                            click_variant_if_found(driver, *needles)
-
-                        try:
-                            WebDriverWait(driver, 8).until(
-                                lambda d: "₹" in (d.page_source or "")
-                            )
-                        except Exception:
-                            pass
-
-                        # Let JS finish hydrating the selected variant before scraping
-                        sleep(JS_SETTLE_AFTER_LOAD)
-
-                        # CSS/XPath locators FIRST, then JSON-LD/meta as fallback
-                        p, raw, m = scraper.get_price(driver)
-
-                        # Audit: capture what JSON-LD said even if we used a CSS hit,
-                        # so we can spot variant mismatches in scraped_data.json
-                        try:
-                            jp, _ = get_price_from_jsonld(driver)
-                            json_ld_price = jp
-                        except Exception:
-                            json_ld_price = None
-
-                        # Capture audit metadata (final URL after redirects, page h1)
-                        try:
-                            final_url = driver.current_url or product_url
-                        except Exception:
-                            final_url = product_url
-                        page_h1 = get_page_h1(driver)
-
-                        price_value, raw_text, method = p, raw, m
-
-                        # Check for out-of-stock signals
-                        if price_value is not None:
-                            in_stock = not is_page_out_of_stock(driver)
-
-                        status = "ok" if price_value is not None else "price_not_found"
-                        if price_value is not None and not in_stock:
-                            status = "out_of_stock"
-                        break
-
+                        site_results[(product_key, website_name)] = future.result()
                     except Exception as e:
-                        status = f"error:{type(e).__name__}"
-                        sleep(1.0 * attempt)
-                else:
-                    try:
-                        fn_base = f"{slugify(product_key)}__{slugify(website_name)}"
-                        driver.save_screenshot(os.path.join(DEBUG_DIR, f"{fn_base}.png"))
-                        with open(os.path.join(DEBUG_DIR, f"{fn_base}.html"), "w", encoding="utf-8") as fp:
-                            fp.write(driver.page_source)
-                    except Exception:
-                        pass
-
-                price_display = f"₹{price_value:.2f}" if price_value is not None else "Price Not Available"
-
-                product_data[website_name] = {
-                    "status": status,
-                    "currency": DEFAULT_CURRENCY,
-                    "price_value": price_value,
-                    "original_price": None,
-                    "price_display": price_display,
-                    "raw": raw_text,
-                    "link": product_url,
-                    "final_url": final_url,
-                    "method": method,
-                    "page_h1": page_h1,
-                    "json_ld_price": json_ld_price,
-                }
-
-            results[product_key] = {
-                "product_name": product_name,
-                "sites": product_data
-            }
-
+                        print(f"    [ERROR] {product_key} / {website_name}: {e}")
+                        site_results[(product_key, website_name)] = {
+                            "status": f"error:{type(e).__name__}",
+                            "currency": DEFAULT_CURRENCY,
+                            "price_value": None,
+                            "original_price": None,
+                            "price_display": PRICE_NOT_AVAILABLE,
+                            "raw": None,
+                            "link": product_url,
+                            "final_url": "",
+                            "method": None,
+                            "page_h1": "",
+                            "json_ld_price": None,
+                        }
+                    info = site_results[(product_key, website_name)]
+                    writer.writerow(_csv_row(product_key, product_names[product_key], website_name, info))
+                    csv_fp.flush()
+                    if not _is_error(info):
+                        ndjson_fp.write(json.dumps({"p": product_key, "s": website_name, **info}, ensure_ascii=False) + "\n")
+                        ndjson_fp.flush()
+            except BaseException:
+                # Ctrl-C or a failed write: don't let __exit__ run the whole queue
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
     finally:
-        driver.quit()
+        csv_fp.close()
+        ndjson_fp.close()
+        flush_debug_artifacts()
+        quit_all_drivers()
+        parse_price.cache_clear()
+        normalize_price_text.cache_clear()
+
+    # Reassemble in the original products × websites order
+    results: Dict[str, Dict] = {}
+    for product_key, website_name, _, _, _ in tasks:
+        entry = results.setdefault(product_key, {"product_name": product_names[product_key], "sites": {}})
+        entry["sites"][website_name] = site_results[(product_key, website_name)]
 
     with open(OUTPUT_JSON_PATH, "w", encoding="utf-8") as f:
         json.dump(results, f, indent=2, ensure_ascii=False)
 
-    flat_rows = []
-    for product_key, payload in results.items():
-        product_name = payload.get("product_name")
-        sites = payload.get("sites", {})
-
-        for site, info in sites.items():
-            flat_rows.append({
-                "ProductKey": product_key,
-                "ProductName": product_name,
-                "Website": site,
-                "Status": info.get("status"),
-                "Currency": info.get("currency"),
-                "Price": info.get("price_value"),
-                "OriginalPrice": info.get("original_price"),
-                "Method": info.get("method"),
-                "JsonLdPrice": info.get("json_ld_price"),
-                "FinalURL": info.get("final_url"),
-                "PageH1": info.get("page_h1"),
-                "Link": info.get("link"),
-                "Raw": info.get("raw"),
-            })
-
-    pd.DataFrame(flat_rows).to_csv(OUTPUT_CSV_PATH, index=False)
+    # Run finished — the next run must start fresh rather than resume
+    os.remove(OUTPUT_NDJSON_PATH)
 
     print("\nScraping completed. Output saved to:")
     print(f"- {OUTPUT_JSON_PATH}")